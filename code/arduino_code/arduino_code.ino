@@ -15,7 +15,7 @@ const int trigPin = 9;     // Ultrasonic sensor TRIG pin (sends the sound pulse)
 const int echoPin = 10;    // Ultrasonic sensor ECHO pin (receives the echo)
 
 // --- Serial Communication ---
-const unsigned long BAUD = 9600; // Serial baud rate (must match host computer)
+const unsigned long BAUD = 115200; // Serial baud rate (must match ARDUINO_BAUD in config.json)
 
 // --- Door Sensor Logic & State ---
 const int DOOR_OPEN_THRESHOLD_CM = 15;   // Distance (cm) to consider the door "open"
@@ -4,10 +4,12 @@ audio_manager.py
 A non-blocking, text-to-speech (TTS) module that uses:
 - gTTS (Google Text-to-Speech) to generate audio (requires internet).
 - Pygame to play the audio.
-- Threading to prevent the UI from freezing during audio generation and playback.
+- A single background thread, fed by a small bounded queue, to prevent the
+  UI from freezing during audio generation and playback.
 """
 
 import pygame
+import queue
 import threading
 from gtts import gTTS
 from io import BytesIO  # Used to handle the in-memory MP3 file
@@ -15,6 +17,11 @@ from io import BytesIO  # Used to handle the in-memory MP3 file
 # Module-level flag to track if pygame has been initialized
 _audio_initialized = False
 
+# Pending speech requests. Kept small on purpose: if the speaker falls
+# behind, new requests are dropped instead of piling up stale messages.
+_speech_queue = queue.Queue(maxsize=2)
+_speech_thread = None
+
 def _play_task(text_to_speak):
     """
     This is the worker function that runs in a separate thread.
@@ -58,6 +65,17 @@ def _play_task(text_to_speak):
         # Catch any other unexpected errors (e.g., pygame mixer issues)
         print(f"AUDIO_ERROR: {e}")
 
+def _speech_worker():
+    """
+    Runs in a single daemon thread and speaks queued messages one at a time.
+    A 'None' item tells the worker to exit.
+    """
+    while True:
+        text = _speech_queue.get()
+        if text is None:
+            break
+        _play_task(text)
+
 # --- Public Functions ---
 
 def init_audio():
@@ -65,7 +83,7 @@ def init_audio():
     Initializes the audio manager. 
     Call this ONCE when your application starts.
     """
-    global _audio_initialized
+    global _audio_initialized, _speech_thread
     if _audio_initialized:
         return  # Already initialized
 
@@ -73,6 +91,12 @@ def init_audio():
         # We only init the main pygame module here.
         # The mixer will be initialized in the worker thread.
         pygame.init()
+
+        # Start the one thread that does all TTS generation and playback
+        # daemon=True means the thread won't prevent the app from exiting
+        _speech_thread = threading.Thread(target=_speech_worker, daemon=True)
+        _speech_thread.start()
+
         _audio_initialized = True
         print("Audio Manager Initialized.")
     except Exception as e:
@@ -94,17 +118,11 @@ def speak(text):
     
     try:
         # --- Simple Spam Protection ---
-        # Limit the number of concurrent audio threads to prevent
-        # the app from being overwhelmed.
-        if threading.active_count() < 10: 
-            # Start the _play_task in a new background thread
-            # daemon=True means the thread won't prevent the app from exiting
-            t = threading.Thread(target=_play_task, args=(text,), daemon=True)
-            t.start()
-        else:
-            print("AUDIO_SPAM_PROTECT: Too many sounds playing.")
-    except Exception as e:
-        print(f"Error starting audio thread: {e}")
+        # Never block the caller (often the GUI thread). If the queue is
+        # already full, this message is dropped.
+        _speech_queue.put_nowait(text)
+    except queue.Full:
+        print("AUDIO_SPAM_PROTECT: Too many sounds queued.")
 
 def quit_audio():
     """
@@ -114,6 +132,11 @@ def quit_audio():
     global _audio_initialized
     if _audio_initialized:
         try:
+            # Ask the speech thread to exit (it's a daemon, so don't wait)
+            try:
+                _speech_queue.put_nowait(None)
+            except queue.Full:
+                pass
             pygame.quit()  # Clean up all pygame modules
             _audio_initialized = False
             print("Audio Manager shut down.")
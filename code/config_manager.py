@@ -26,7 +26,7 @@ class ConfigManager:
         # These are used if the config file is missing or a key is missing.
         self.defaults = {
             'ARDUINO_PORT': "COM5",
-            'ARDUINO_BAUD': 9600,
+            'ARDUINO_BAUD': 115200,     # Must match BAUD in arduino_code.ino
             'INTENT_TIME_SEC': 1.0,     # Time user must stare at camera
             'LOITER_TIME_SEC': 10.0,    # Time an unknown person can be present
             'COUNTDOWN_SECONDS': 10,    # Unlock duration
@@ -35,6 +35,13 @@ class ConfigManager:
             'DOOR_AJAR_TIMEOUT': 20,    # Seconds until door-ajar alert
             'LIVENESS_BLINKS': 2,       # Required blinks for liveness check
             'MAX_SAMPLES': 1000,        # Max face samples per user
+            'TARGET_FPS': 30,           # Camera frame rate (and the loop's upper limit)
+            'DISPLAY_FPS': 20,          # Max video feed refresh rate (rounded to TARGET_FPS / n)
+            'CAMERA_WIDTH': 640,        # Requested capture resolution
+            'CAMERA_HEIGHT': 480,
+            'MIN_FACE_SIZE': 80,        # Smallest face (pixels) the Haar detector looks for
+            'RECOG_EVERY_N': 5,         # Run face recognition on every Nth frame
+            'DEBUG_OVERLAY': False,     # Draw the eye landmarks during the liveness check
         }
         
         # Load the configuration on initialization
@@ -1,23 +1,119 @@
 import cv2
 import mediapipe
 import sys
-import numpy as np
 import os
 import pygame 
 import threading
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QPushButton, QMainWindow, QSizePolicy,
                              QMessageBox)
-from PyQt5.QtGui import QFont, QPixmap, QImage
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QFont, QPainter
+from PyQt5.QtCore import Qt, QTimer, QEvent, QRect, pyqtSignal, pyqtSlot
 
 # --- Custom Application Modules ---
-from recognition_thread import RecognitionThread, ArduinoRelay
+from recognition_thread import RecognitionThread, ArduinoRelay, frame_publish_interval
 from admin_login_dialog import LoginDialog 
 from config_manager import ConfigManager
 from admin_panel import AdminPanel
 import audio_manager # Handles all text-to-speech feedback
 
+# --- OpenCV Runtime Settings ---
+# Nothing in this app uses UMat, so skip OpenCL entirely. On some OpenCV
+# builds the first cvtColor call otherwise stalls while OpenCL initialises.
+cv2.ocl.setUseOpenCL(False)
+# Leave a couple of cores free for the Qt UI and audio threads
+cv2.setNumThreads(max(1, (os.cpu_count() or 1) - 2))
+
+# --- Paths (resolved once at import) ---
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_STYLE_PATH = os.path.join(_SCRIPT_DIR, "style.css")
+
+def _read_stylesheet():
+    """Reads style.css from this folder. Returns None if it can't be read."""
+    try:
+        with open(_STYLE_PATH, "r") as f:
+            return f.read()
+    except Exception as e:
+        print(f"Could not load stylesheet: {e}")
+        return None
+
+# Read once at import; shared by the QApplication and the MainWindow
+_STYLE_CSS = _read_stylesheet()
+
+def _status_style(color):
+    """Builds the status label stylesheet for a given text color."""
+    return f"font-size: 32px; font-weight: bold; color: {color};"
+
+# Prebuilt status styles: red (locked/alert), green (unlocked),
+# orange (door ajar) and blue (admin)
+_STATUS_STYLES = {c: _status_style(c) for c in ("#FF3333", "#00FF00", "#FFA500", "#007ACC")}
+
+# -------------------------------------------------------------------
+# --- Video Feed Widget ---
+# -------------------------------------------------------------------
+class VideoLabel(QLabel):
+    """
+    A QLabel that paints live video frames itself.
+
+    Frames are drawn straight from the worker's QImage in paintEvent, with
+    no per-frame QPixmap in between, and each new frame only repaints the
+    area it covers. Text set with setText() (e.g. "ADMIN MODE") is shown
+    as in a normal QLabel.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._image = None      # Current frame (QImage)
+        self._pixels = None     # Array the QImage points into; keeps it alive
+        self._frame_rect = None # Where the frame is drawn inside the label
+
+    def show_frame(self, qt_image, pixels):
+        """
+        Shows a QImage on the next repaint. 'pixels' is the numpy array the
+        image points into; it is kept alive for as long as the image is shown.
+        """
+        if self.text():
+            super().clear() # Hide "INITIALIZING..." etc. behind the video
+        old_rect = self._frame_rect
+        self._image, self._pixels = qt_image, pixels
+        self._frame_rect = self._fit_rect()
+
+        if self._frame_rect == old_rect:
+            self.update(self._frame_rect) # Same geometry: repaint just the frame
+        else:
+            self.update()
+
+    def setText(self, text):
+        """Shows text instead of video (drops the last frame)."""
+        self._image = self._pixels = self._frame_rect = None
+        super().setText(text)
+
+    def _fit_rect(self):
+        """Centres the current frame in the label, shrinking it if needed."""
+        area = self.contentsRect()
+        size = self._image.size()
+        # A frame can still arrive at the old size right after a resize.
+        # Fit it with Qt's default nearest-neighbour scaling; smoothing is
+        # imperceptible on a live feed.
+        if size.width() > area.width() or size.height() > area.height():
+            size = size.scaled(area.size(), Qt.KeepAspectRatio)
+        x = area.x() + (area.width() - size.width()) // 2
+        y = area.y() + (area.height() - size.height()) // 2
+        return QRect(x, y, size.width(), size.height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._image is not None:
+            self._frame_rect = self._fit_rect()
+
+    def paintEvent(self, event):
+        super().paintEvent(event) # Background, border and any text
+        if self._image is None:
+            return
+        painter = QPainter(self)
+        painter.drawImage(self._frame_rect, self._image)
+        painter.end()
+
 # -------------------------------------------------------------------
 # --- Main Window (UI) ---
 # -------------------------------------------------------------------
@@ -30,6 +126,7 @@ class MainWindow(QMainWindow):
     # Signals to communicate from the UI (main thread) to the worker thread
     manual_unlock_signal = pyqtSignal()
     manual_lock_signal = pyqtSignal()
+    display_size_signal = pyqtSignal(int, int)
     
     def __init__(self):
         super().__init__()
@@ -40,7 +137,17 @@ class MainWindow(QMainWindow):
         
         # Used to prevent spamming the "Door Ajar" popup
         self.door_alert_popup = None
-        
+
+        # Last status shown, so repeated identical updates can be skipped
+        self._last_status = (None, None)
+        self._last_status_color = None
+
+        # Paints the worker's latest frame at the rate the worker publishes
+        # at (see start_recognition). Any extra frames simply replace each
+        # other and are never converted.
+        self._paint_timer = QTimer(self)
+        self._paint_timer.timeout.connect(self.drain_frame)
+
         # --- Initialize Audio Manager ---
         # This is called *once* at startup.
         try:
@@ -53,14 +160,10 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 800, 600)
         self.setMinimumSize(640, 480)
         
-        # Load external stylesheet
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            style_path = os.path.join(script_dir, "style.css")
-            with open(style_path, "r") as f:
-                self.setStyleSheet(f.read())
-        except Exception as e:
-            print(f"Could not load stylesheet: {e}")
+        # Apply external stylesheet
+        if _STYLE_CSS is not None:
+            self.setStyleSheet(_STYLE_CSS)
+        else:
             # Fallback style if stylesheet fails
             self.setStyleSheet("QWidget { background-color: #2E2E2E; color: #FFFFFF; }")
 
@@ -73,7 +176,7 @@ class MainWindow(QMainWindow):
         
         # --- Video Feed Label ---
         # This label will display the camera feed
-        self.video_label = QLabel(self)
+        self.video_label = VideoLabel(self)
         self.video_label.setObjectName("VideoLabel")
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
@@ -81,6 +184,8 @@ class MainWindow(QMainWindow):
         font = self.video_label.font()
         font.setPointSize(20)
         self.video_label.setFont(font)
+        # Watch for resizes so the worker can scale frames to fit
+        self.video_label.installEventFilter(self)
         
         # --- Status Panel (Right Sidebar) ---
         status_panel = QWidget()
@@ -146,7 +251,6 @@ class MainWindow(QMainWindow):
             return
 
         # --- Connect signals from worker thread to UI slots ---
-        self.worker.frame_ready.connect(self.display_frame)
         self.worker.status_updated.connect(self.set_status)
         self.worker.info_updated.connect(self.set_info)
         self.worker.door_alert_signal.connect(self.show_door_alert)
@@ -154,25 +258,45 @@ class MainWindow(QMainWindow):
         # --- Connect signals from UI to worker thread ---
         self.manual_unlock_signal.connect(self.worker.on_manual_unlock)
         self.manual_lock_signal.connect(self.worker.on_manual_lock)
+        self.display_size_signal.connect(self.worker.on_display_resized)
+        self.emit_display_size()
         
-        # Start the thread's .run() method
+        # Start the thread's .run() method and begin painting its frames,
+        # polling at the worker's publish rate (config may have changed)
         self.worker.start()
+        self._paint_timer.setInterval(int(1000 * frame_publish_interval(self.config)))
+        self._paint_timer.start()
 
     # --- UI Update Slots (Called by Worker Thread) ---
 
-    @pyqtSlot(np.ndarray)
-    def display_frame(self, frame):
-        """Updates the video_label with a new frame from the worker."""
-        qt_image = self.convert_cv_to_qt(frame)
-        self.video_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
-            self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        ))
+    def drain_frame(self):
+        """Called by the paint timer. Shows the worker's newest frame, if any."""
+        published = self.worker.take_frame()
+        if published is not None:
+            self.display_frame(*published)
+
+    def display_frame(self, qt_image, pixels):
+        """
+        Updates the video_label with a new frame from the worker.
+        The worker has already scaled the frame and wrapped it in a QImage.
+        """
+        # The QImage borrows its pixels' memory; the label keeps them alive
+        self.video_label.show_frame(qt_image, pixels)
 
     @pyqtSlot(str, str)
     def set_status(self, text, color):
         """Updates the main status label (LOCKED/UNLOCKED) and color."""
+        # The worker repeats the same status every frame; re-applying it
+        # would make Qt re-parse the stylesheet and re-layout for nothing.
+        if (text, color) == self._last_status:
+            return
+        self._last_status = (text, color)
+
         self.status_label.setText(text)
-        self.status_label.setStyleSheet(f"font-size: 32px; font-weight: bold; color: {color};")
+        if color != self._last_status_color:
+            style = _STATUS_STYLES.get(color) or _status_style(color)
+            self.status_label.setStyleSheet(style)
+            self._last_status_color = color
         
         # Show the "Lock Now" button only when the door is unlocked
         if text == "UNLOCKED":
@@ -201,6 +325,9 @@ class MainWindow(QMainWindow):
                 msg.setWindowTitle(title)
                 msg.setText(message)
                 msg.setStandardButtons(QMessageBox.Ok)
+                # QMessageBox is modal by default, which would lock out the
+                # "Lock Now" / "Manual Unlock" buttons while the alert is up.
+                msg.setModal(False)
 
                 self.door_alert_popup = msg # Store the instance
 
@@ -223,13 +350,22 @@ class MainWindow(QMainWindow):
 
     # --- Utility and Button Functions ---
 
-    def convert_cv_to_qt(self, cv_img):
-        """Converts an OpenCV BGR image to a Qt QImage (RGB)."""
-        rgb_image = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        return convert_to_Qt_format.copy()
+    def exec_with_feed_paused(self, dialog):
+        """
+        Runs a blocking dialog's exec_() with the video feed paused, so the
+        worker doesn't scale and publish frames that nobody will see.
+        Returns the result of exec_().
+        """
+        feed_running = hasattr(self, 'worker') and self.worker.isRunning()
+        if feed_running:
+            self._paint_timer.stop()
+            self.worker.display_paused = True
+        try:
+            return dialog.exec_()
+        finally:
+            if feed_running:
+                self.worker.display_paused = False
+                self._paint_timer.start()
 
     def open_manual_unlock(self):
         """Opens the password dialog for a manual override."""
@@ -239,8 +375,8 @@ class MainWindow(QMainWindow):
             
         dialog = LoginDialog(mode='unlock', parent=self)
         
-        # .exec_() blocks until the dialog is closed
-        if dialog.exec_(): 
+        # Blocks until the dialog is closed
+        if self.exec_with_feed_paused(dialog): 
             if dialog.was_login_successful():
                 # Emit the signal to tell the worker thread to unlock
                 self.manual_unlock_signal.emit()
@@ -253,7 +389,7 @@ class MainWindow(QMainWindow):
         3. Open the AdminPanel
         """
         dialog = LoginDialog(mode='admin', parent=self)
-        if not dialog.exec_():
+        if not self.exec_with_feed_paused(dialog):
             return # User cancelled
         
         if not dialog.was_login_successful():
@@ -268,13 +404,14 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 print(f"Could not send admin lock command: {e}")
             
-            # Disconnect all signals to prevent crashes during shutdown
+            # Stop painting and disconnect all signals to prevent crashes during shutdown
+            self._paint_timer.stop()
             try:
-                self.worker.frame_ready.disconnect()
                 self.worker.status_updated.disconnect()
                 self.worker.info_updated.disconnect()
                 self.manual_unlock_signal.disconnect()
                 self.manual_lock_signal.disconnect()
+                self.display_size_signal.disconnect()
                 self.worker.door_alert_signal.disconnect()
             except TypeError:
                 pass # Signals were already disconnected
@@ -312,6 +449,21 @@ class MainWindow(QMainWindow):
         # Restart the recognition thread
         self.start_recognition()
 
+    def eventFilter(self, obj, event):
+        """Forwards video_label resizes to the worker thread."""
+        if obj is self.video_label and event.type() == QEvent.Resize:
+            self.emit_display_size()
+        return super().eventFilter(obj, event)
+
+    def emit_display_size(self):
+        """
+        Sends the video label's drawable size to the worker. This is the
+        contentsRect (inside the style.css border), so frames the worker
+        fits to it are painted as-is, without rescaling on the GUI thread.
+        """
+        area = self.video_label.contentsRect()
+        self.display_size_signal.emit(area.width(), area.height())
+
     def closeEvent(self, event):
         """
         Overrides the main window's close event (e.g., clicking 'X').
@@ -321,6 +473,7 @@ class MainWindow(QMainWindow):
         audio_manager.speak("System shutting down.")
         
         # Stop the worker thread cleanly
+        self._paint_timer.stop()
         if hasattr(self, 'worker'):
             self.worker.stop()
             self.worker.wait() # Wait for it to finish
@@ -337,14 +490,9 @@ if __name__ == '__main__':
     
     app = QApplication(sys.argv)
     
-    # Try to apply the global stylesheet to the entire app
-    try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        style_path = os.path.join(script_dir, "style.css")
-        with open(style_path, "r") as f:
-            app.setStyleSheet(f.read())
-    except Exception as e:
-        print(f"Could not load global stylesheet: {e}")
+    # Apply the global stylesheet to the entire app
+    if _STYLE_CSS is not None:
+        app.setStyleSheet(_STYLE_CSS)
 
     # Create and show the main window
     window = MainWindow()
@@ -1,14 +1,252 @@
 import cv2
 import numpy as np
 import os
+import sys
 import time
+import math
 import serial
 import csv
+import threading
+import queue
+import hashlib
+import selectors
 import mediapipe as mp
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from PyQt5.QtCore import QThread, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QThread, QMutex, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage
 import audio_manager  # Handles all text-to-speech feedback
 
+# numba is optional: when installed, the small per-frame EAR kernel below is
+# compiled to machine code. Without it the same code runs as plain Python.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Folder containing this file; resolved once rather than per worker instance
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# An unchanged status/info text is re-sent to the UI at most this often
+STATUS_REFRESH_INTERVAL = 0.2
+
+def frame_publish_every_n(config):
+    """
+    Every how many camera frames one is handed to the UI. Frames only
+    arrive at TARGET_FPS, so this is the nearest whole step that keeps
+    the feed at or below DISPLAY_FPS.
+    """
+    target_fps = max(1, config['TARGET_FPS'])
+    return max(1, math.ceil(target_fps / max(1, config['DISPLAY_FPS'])))
+
+def frame_publish_interval(config):
+    """
+    Seconds between frames handed to the UI at the camera's TARGET_FPS
+    (the rate frame_publish_every_n actually gives). The UI's paint timer
+    is set from this, so it polls in step with the worker.
+    """
+    return frame_publish_every_n(config) / max(1, config['TARGET_FPS'])
+
+# FaceMesh input is the camera frame shrunk to this width (e.g. 640x480 ->
+# 320x240), whatever the camera resolution; the LBPH crop and intruder
+# snapshots still come from the full-resolution frame
+MESH_WIDTH = 320
+
+# Intruder snapshots: quality 70 is plenty to identify someone and roughly
+# halves the file size (and SD-card write time) versus the default 95
+SNAPSHOT_JPEG_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), 70, int(cv2.IMWRITE_JPEG_OPTIMIZE), 1]
+
+# -------------------------------------------------------------------
+# Qt >= 5.14 can display BGR buffers directly (None on older versions)
+_BGR_FORMAT = getattr(QImage, 'Format_BGR888', None)
+
+# -------------------------------------------------------------------
+# --- Liveness (Eye Aspect Ratio) ---
+# -------------------------------------------------------------------
+# Mediapipe landmark indices for EAR, in P1..P6 order. Tuples of plain
+# ints, since they index the landmark list directly.
+LEFT_EYE_EAR_INDICES = (362, 385, 387, 263, 373, 380)
+RIGHT_EYE_EAR_INDICES = (33, 158, 160, 133, 144, 153)
+# Both eyes' points in one index tuple (left eye first)
+EYE_IDX = LEFT_EYE_EAR_INDICES + RIGHT_EYE_EAR_INDICES
+# Pixel offsets (dy, dx) of the small "+" drawn on each eye point
+_DOT_DY = np.array([0, -1, 1, 0, 0], dtype=np.int32)
+_DOT_DX = np.array([0, 0, 0, -1, 1], dtype=np.int32)
+
+# Mediapipe's face-oval (silhouette) landmarks, used for the face box
+SILHOUETTE = (10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
+              397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
+              172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109)
+
+def eye_points(landmarks, frame_w, frame_h):
+    """Returns the 12 EAR eye points (EYE_IDX order) in pixels, as a (12, 2) array."""
+    # Read x, y straight into one flat float32 buffer (no per-point tuples)
+    pts = np.fromiter((c for i in EYE_IDX for c in (landmarks[i].x, landmarks[i].y)),
+                      dtype=np.float32, count=2 * len(EYE_IDX)).reshape(-1, 2)
+    pts *= np.array([frame_w, frame_h], dtype=np.float32)
+    return pts
+
+def _eye_ear(pts, o):
+    """EAR of the eye whose P1..P6 are rows o..o+5 of 'pts'."""
+    a = math.hypot(pts[o + 1, 0] - pts[o + 5, 0], pts[o + 1, 1] - pts[o + 5, 1]) # P2-P6
+    b = math.hypot(pts[o + 2, 0] - pts[o + 4, 0], pts[o + 2, 1] - pts[o + 4, 1]) # P3-P5
+    c = math.hypot(pts[o, 0] - pts[o + 3, 0], pts[o, 1] - pts[o + 3, 1])         # P1-P4
+    if c > 0:
+        return (a + b) / (2.0 * c)
+    return 0.3 # Avoid division by zero
+
+def _eye_ears(pts):
+    return _eye_ear(pts, 0), _eye_ear(pts, 6)
+
+# Six distances on twelve points is far too little work for numpy; its
+# per-call overhead dominated. Compiled, the whole thing is a few hundred ns.
+if njit is not None:
+    _eye_ear = njit(cache=True, fastmath=True)(_eye_ear)
+    _eye_ears = njit(cache=True, fastmath=True)(_eye_ears)
+
+def eye_aspect_ratios(pts):
+    """
+    Calculates the Eye Aspect Ratio (EAR) of both eyes for liveness detection.
+    EAR = (||P2-P6|| + ||P3-P5||) / (2 * ||P1-P4||)
+    'pts' comes from eye_points(). Returns (left_ear, right_ear); an eye with
+    zero width counts as open (0.3).
+    """
+    left_ear, right_ear = _eye_ears(pts)
+    return float(left_ear), float(right_ear)
+
+def draw_eye_points(image, pts, color=(0, 255, 0)):
+    """Marks each eye point with a small '+' using a single indexed write."""
+    h, w = image.shape[:2]
+    xs = pts[:, 0].astype(np.int32)[:, None] + _DOT_DX
+    ys = pts[:, 1].astype(np.int32)[:, None] + _DOT_DY
+    image[np.clip(ys, 0, h - 1), np.clip(xs, 0, w - 1)] = color
+
+# -------------------------------------------------------------------
+# --- LBP Histogram Matching ---
+# -------------------------------------------------------------------
+# Side length of the square grayscale faces the recognizer works on
+# (collect_facial_data.py saves its samples at this size)
+FACE_SIZE = 200
+# These mirror OpenCV's LBPHFaceRecognizer defaults (radius 1, 8 neighbours,
+# 8x8 grid), so our histograms line up with the ones stored in the model.
+LBP_GRID = 8
+LBP_BINS = 256
+MATCH_CHUNK = 64  # Training histograms compared per numpy pass
+# Bump whenever face preprocessing or the LBP maths change, so a trained
+# model cache from the old code is never reused
+MODEL_CACHE_VERSION = 1
+# Largest change in match score (distance / 300) allowed from keeping the
+# histogram table in float16; past this, the table stays float32
+FLOAT16_SCORE_TOL = 1e-3
+_FLT_EPS = np.float32(np.finfo(np.float32).eps)
+
+def _lbp_samples():
+    """
+    Neighbour offsets and bilinear weights for each of the 8 LBP bits,
+    computed the same way as OpenCV's elbp().
+    """
+    samples = []
+    for n in range(8):
+        x = np.float32(np.cos(2.0 * np.pi * n / 8.0))
+        y = np.float32(-np.sin(2.0 * np.pi * n / 8.0))
+        fx, fy = int(np.floor(x)), int(np.floor(y))
+        cx, cy = int(np.ceil(x)), int(np.ceil(y))
+        tx, ty = x - np.float32(fx), y - np.float32(fy)
+        one = np.float32(1.0)
+        weights = ((one - tx) * (one - ty), tx * (one - ty), (one - tx) * ty, tx * ty)
+        samples.append((fy, fx, cy, cx, weights))
+    return samples
+
+_LBP_SAMPLES = _lbp_samples()
+# The same samples as arrays, for the compiled kernel below
+_LBP_OFFSETS = np.array([smp[:4] for smp in _LBP_SAMPLES], dtype=np.int64)    # (fy, fx, cy, cx)
+_LBP_WEIGHTS = np.array([smp[4] for smp in _LBP_SAMPLES], dtype=np.float32)   # w1..w4
+
+def _lbp_codes(src, offsets, weights, eps, codes):
+    """
+    Per-pixel loop form of the LBP code step in lbp_histogram(), only used
+    compiled (numba). Same float32 arithmetic in the same order, so the codes
+    are bit-identical; writes them into 'codes' (the image minus its border).
+    """
+    rows, cols = src.shape
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            c = src[i, j]
+            code = 0
+            for n in range(8):
+                fy, fx, cy, cx = offsets[n, 0], offsets[n, 1], offsets[n, 2], offsets[n, 3]
+                t = (weights[n, 0] * src[i + fy, j + fx] + weights[n, 1] * src[i + fy, j + cx]
+                     + weights[n, 2] * src[i + cy, j + fx] + weights[n, 3] * src[i + cy, j + cx])
+                if t > c or abs(t - c) < eps:
+                    code |= 1 << n
+            codes[i - 1, j - 1] = code
+
+# One pass over the pixels instead of ~40 full-image numpy operations. No
+# fastmath: reordering the float maths could flip codes near the threshold.
+# nogil, so the kernel on the predict worker overlaps the camera/UI threads.
+_lbp_codes_jit = njit(cache=True, nogil=True)(_lbp_codes) if njit is not None else None
+
+def lbp_histogram(gray):
+    """
+    Computes the spatial LBP histogram of a grayscale face image, matching
+    LBPHFaceRecognizer's internal histogram for the same image.
+    Returns a flat float32 array of LBP_GRID * LBP_GRID * LBP_BINS values.
+    """
+    src = gray.astype(np.float32)
+    rows, cols = src.shape
+
+    # --- LBP codes: one bit per neighbour ---
+    if _lbp_codes_jit is not None:
+        codes = np.empty((rows - 2, cols - 2), np.uint8)
+        _lbp_codes_jit(src, _LBP_OFFSETS, _LBP_WEIGHTS, _FLT_EPS, codes)
+    else:
+        center = src[1:rows - 1, 1:cols - 1]
+        codes = np.zeros(center.shape, np.uint8)
+
+        def shifted(dy, dx):
+            return src[1 + dy:rows - 1 + dy, 1 + dx:cols - 1 + dx]
+
+        for n, (fy, fx, cy, cx, (w1, w2, w3, w4)) in enumerate(_LBP_SAMPLES):
+            t = w1 * shifted(fy, fx) + w2 * shifted(fy, cx) + w3 * shifted(cy, fx) + w4 * shifted(cy, cx)
+            bit = (t > center) | (np.abs(t - center) < _FLT_EPS)
+            codes |= bit.astype(np.uint8) << n
+
+    # --- Per-cell histograms, each normalised by the cell's pixel count ---
+    cell_h = codes.shape[0] // LBP_GRID
+    cell_w = codes.shape[1] // LBP_GRID
+    cells = codes[:cell_h * LBP_GRID, :cell_w * LBP_GRID]
+    cells = cells.reshape(LBP_GRID, cell_h, LBP_GRID, cell_w).transpose(0, 2, 1, 3)
+    cells = cells.reshape(LBP_GRID * LBP_GRID, cell_h * cell_w)
+    offsets = np.arange(LBP_GRID * LBP_GRID, dtype=np.intp)[:, None] * LBP_BINS
+    hist = np.bincount((cells + offsets).ravel(), minlength=LBP_GRID * LBP_GRID * LBP_BINS)
+    return hist.astype(np.float32) / np.float32(cell_h * cell_w)
+
+def chi_square_distances(table, query, row_sums=None):
+    """
+    Chi-square distance (OpenCV's HISTCMP_CHISQR_ALT, the one LBPH uses)
+    from 'query' to every row of 'table'.
+    Uses (a-q)^2/(a+q) = a + q - 4aq/(a+q): the first two terms just add up
+    to the row and query totals, and the last one is zero wherever the query
+    bin is empty, so only the query's non-empty bins (about half) are read.
+    'row_sums' is table.sum(axis=1), if already known. Works through the
+    table in chunks so the temporaries stay small; a float16 table is upcast
+    to float32 per chunk.
+    """
+    if row_sums is None:
+        row_sums = table.sum(axis=1, dtype=np.float64)
+    nz = np.flatnonzero(query)
+    q = query[nz]
+    cross = np.empty(len(table), np.float64)
+    for start in range(0, len(table), MATCH_CHUNK):
+        rows = table[start:start + MATCH_CHUNK, nz].astype(np.float32, copy=False) # (a copy)
+        total = rows + q
+        rows *= q
+        rows /= total # total > 0, as q > 0 in every kept bin
+        cross[start:start + MATCH_CHUNK] = rows.sum(axis=1, dtype=np.float64)
+    dists = 2.0 * (row_sums + query.sum(dtype=np.float64) - 4.0 * cross)
+    # Identical histograms can round to a hair below zero
+    return np.maximum(dists, 0.0, out=dists)
+
 # -------------------------------------------------------------------
 # --- Arduino Relay Class ---
 # -------------------------------------------------------------------
@@ -17,12 +255,24 @@ class ArduinoRelay:
     Manages the serial connection and communication with the Arduino relay.
     Includes a "virtual mode" if the serial port fails to open.
     """
-    def __init__(self, port, baud=9600, timeout=0.1):
+    # Most bytes read per read_messages() call, and the most kept while
+    # waiting for a newline (the Arduino's messages are a few bytes long)
+    RX_LIMIT = 4096
+
+    def __init__(self, port, baud=115200, timeout=0.1):
         self.port = port
         self.baud = baud
         try:
-            # Attempt to open the serial port
-            self.ser = serial.Serial(port, baud, timeout=timeout) 
+            # Attempt to open the serial port. A short write timeout keeps a
+            # stuck port from blocking the writer thread for long.
+            self.ser = serial.Serial(port, baud, timeout=timeout, write_timeout=0.05) 
+            # USB-serial adapters (FTDI etc.) hold incoming bytes for up to
+            # 16 ms by default; low-latency mode passes them on immediately.
+            # Only supported on Linux, so failures are ignored.
+            try:
+                self.ser.set_low_latency_mode(True)
+            except Exception:
+                pass
             # Wait 2 seconds for the Arduino to reset (common requirement)
             time.sleep(2)  
             print(f"Serial port {port} @ {baud} opened successfully.")
@@ -32,22 +282,99 @@ class ArduinoRelay:
             print("Running in 'NO_RELAY' mode. Door will not unlock.")
             self.ser = None
 
+        # Bytes received after the last newline (a line still arriving)
+        self._rx_buf = bytearray()
+
+        # On POSIX the port's file descriptor is registered with a selector,
+        # so read_messages() asks the kernel whether anything arrived rather
+        # than querying pyserial. Windows can't select() on serial handles,
+        # so it keeps using in_waiting.
+        self._rx_sel = None
+        if self.ser and sys.platform != 'win32':
+            sel = selectors.DefaultSelector()
+            try:
+                sel.register(self.ser.fileno(), selectors.EVENT_READ)
+                self._rx_sel = sel
+            except Exception:
+                sel.close()
+
+        # --- Writer Thread ---
+        # send() is called from both the recognition thread and the UI
+        # thread (manual unlock/lock). Commands are queued and written by a
+        # single thread, so callers never block on the port or interleave.
+        self._tx_queue = queue.Queue(maxsize=8)
+        self._writer = None
+        if self.ser:
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        """
+        Writes queued commands to the port until a None sentinel arrives.
+        Commands queued together (e.g. a burst from one loop iteration) go
+        out as a single write + flush instead of one USB transfer each.
+        """
+        while True:
+            batch = [self._tx_queue.get()]
+            while True:
+                try:
+                    batch.append(self._tx_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            if stop:
+                batch = batch[:batch.index(None)]
+            if batch:
+                try:
+                    # Each command is sent with a newline terminator
+                    self.ser.write(''.join(m + '\n' for m in batch).encode('utf-8'))
+                    self.ser.flush() # Ensure the data is sent
+                    print(f"Sent to Arduino: {', '.join(batch)}")
+                except Exception as e:
+                    print(f"Serial write error: {e}")
+            if stop:
+                break
+
+    def read_messages(self):
+        """
+        Returns the complete lines received from the Arduino since the last
+        call (stripped, empty lines skipped). Everything waiting is fetched
+        with a single read and split here, instead of one readline() per line.
+        """
+        if not self.ser:
+            return []
+        # Zero timeout: only checks, never waits
+        if self._rx_sel is not None and not self._rx_sel.select(0):
+            return []
+        n = self.ser.in_waiting
+        if not n:
+            return []
+        # Capped so one call can never spend long on a flood of input; the
+        # rest is simply picked up on the next call
+        self._rx_buf += self.ser.read(min(n, self.RX_LIMIT))
+        # The last piece has no newline yet; keep it for the next call
+        *lines, self._rx_buf = self._rx_buf.split(b'\n')
+        if len(self._rx_buf) > self.RX_LIMIT:
+            # Line noise with no newline in sight; don't let it grow forever
+            print("Serial input without newline discarded.")
+            self._rx_buf = bytearray()
+        return [m for m in (line.decode('utf-8', errors='ignore').strip() for line in lines) if m]
+
     def send(self, msg):
         """
-        Sends a command string to the Arduino, appending a newline.
+        Queues a command string for the Arduino (a newline is appended).
+        Returns immediately; returns False if the command couldn't be queued.
         In virtual mode, it just prints the command.
         """
         if not self.ser:
             print(f"VIRTUAL RELAY: {msg}") # Print to console if not connected
             return True
         try:
-            # Encode the message and send it with a newline terminator
-            self.ser.write((msg + '\n').encode('utf-8'))
-            self.ser.flush() # Ensure the data is sent
-            print(f"Sent to Arduino: {msg}")
+            self._tx_queue.put_nowait(msg)
             return True
-        except Exception as e:
-            print(f"Serial write error: {e}")
+        except queue.Full:
+            print(f"Serial write queue full, dropped: {msg}")
             return False
 
     def close(self):
@@ -55,10 +382,67 @@ class ArduinoRelay:
         Closes the serial port. Sends a "Lock" command first as a safety.
         """
         if self.ser:
-            self.send("L") # Send a final "Lock" command
+            # The final "Lock" must not be dropped, so wait for queue space
+            self._tx_queue.put("L")
+            self._tx_queue.put(None) # Stop the writer once the queue is drained
+            self._writer.join(timeout=2.0)
+            if self._rx_sel is not None:
+                self._rx_sel.close()
+                self._rx_sel = None
             self.ser.close()
             print("Serial port closed.")
 
+# -------------------------------------------------------------------
+# --- Camera Capture Thread ---
+# -------------------------------------------------------------------
+class CaptureThread(QThread):
+    """
+    Reads frames from the camera in its own thread, so waiting on the camera
+    overlaps with recognition work instead of blocking it. Frames are
+    mirrored here too, so the flip also runs off the recognition thread.
+    Only the newest frame is kept; frames nobody picked up are dropped.
+    """
+    def __init__(self, cap, parent=None):
+        super().__init__(parent)
+        self.cap = cap
+        self.running = True
+        # Single slot holding the newest unread frame (None once taken)
+        self._frame = None
+        self._frame_ready = threading.Condition()
+
+    def run(self):
+        """Producer loop: read frames as fast as the camera delivers them."""
+        raw = None # Decode buffer, reused (only this thread touches it)
+        while self.running:
+            ret, raw = self.cap.read(raw)
+            if not ret:
+                print("Camera feed lost.")
+                raw = None
+                time.sleep(1.0)
+                continue
+            # Mirror into a new array: once handed over, the frame belongs
+            # to the consumer (and possibly the UI), so it is never reused
+            frame = cv2.flip(raw, 1)
+            with self._frame_ready:
+                self._frame = frame # Overwrites a frame that was never taken
+                self._frame_ready.notify()
+
+    def get_frame(self, timeout):
+        """
+        Waits up to 'timeout' seconds for a new frame.
+        Returns the newest frame and empties the slot, so the same frame is
+        never returned twice. Returns None if no frame arrived in time.
+        """
+        with self._frame_ready:
+            if self._frame is None:
+                self._frame_ready.wait(timeout)
+            frame, self._frame = self._frame, None
+        return frame
+
+    def stop(self):
+        """Sets the flag to stop the producer loop."""
+        self.running = False
+
 # -------------------------------------------------------------------
 # --- Worker Thread for Face Recognition ---
 # -------------------------------------------------------------------
@@ -68,8 +452,7 @@ class RecognitionThread(QThread):
     and recognition logic in a background thread to keep the UI responsive.
     """
     # --- Signals for UI Updates ---
-    # Emits the processed video frame
-    frame_ready = pyqtSignal(np.ndarray)
+    # (Video frames don't use a signal; see publish_frame / take_frame.)
     # Emits the main status (e.g., "LOCKED") and its color
     status_updated = pyqtSignal(str, str)
     # Emits secondary info (e.g., "Blinks: 1/2")
@@ -82,17 +465,72 @@ class RecognitionThread(QThread):
         # --- State and Paths ---
         self.running = True
         self.config = {}
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.log_file = os.path.join(script_dir, "..", "access_log.csv")
-        self.intruder_folder = os.path.join(script_dir, "..", "intruders")
-        self.haarcascade_path = os.path.normpath(os.path.join(script_dir, "..", "requirements", "haarcascade_frontalface_default.xml"))
-        self.data_path = os.path.join(script_dir, "..", "face_images")
+        self.log_file = os.path.join(_SCRIPT_DIR, "..", "access_log.csv")
+        self.intruder_folder = os.path.join(_SCRIPT_DIR, "..", "intruders")
+        # Create it up front so alert snapshots never fail on a missing folder
+        os.makedirs(self.intruder_folder, exist_ok=True)
+        self.haarcascade_path = os.path.normpath(os.path.join(_SCRIPT_DIR, "..", "requirements", "haarcascade_frontalface_default.xml"))
+        self.data_path = os.path.join(_SCRIPT_DIR, "..", "face_images")
+        # Trained histogram table, reused while face_images is unchanged
+        self.model_cache = os.path.join(_SCRIPT_DIR, "..", "model_cache.npz")
         
         # --- Models and Hardware ---
         self.model = None    # The LBPH face recognizer
+        # Training histograms stacked as one (N, D) matrix, and their labels;
+        # lets match_face compare a face against all of them in one go
+        self._H = None
+        self._H_labels = None
+        self._H_sums = None  # Row sums of _H (see chi_square_distances)
+        self._use_table = False
         self.user_map = {}   # Maps model IDs (0, 1, 2) to names ("john_doe")
         self.relay = None
         self.cap = None
+        self.capture = None  # CaptureThread feeding us camera frames
+
+        # Size (w, h) of the UI video area; frames are scaled to fit it here
+        # so the GUI thread doesn't have to rescale every frame.
+        self.display_size = None
+        # Cached resize parameters for the current (frame, display) sizes
+        self._fit_key = None
+        self._fit_params = None
+        # Cached QImage constructor arguments for the current frame size
+        self._qimg_shape = None
+        self._qimg_params = None
+
+        # Single-slot "latest frame" inbox polled by the UI. Unlike a queued
+        # signal, a slow UI can never make stale frames pile up here.
+        self._latest_frame = None
+        self._frame_lock = QMutex()
+        # Set by the UI while a modal dialog hides the video feed
+        self.display_paused = False
+
+        # Last status/info sent to the UI (see update_status / update_info)
+        self._last_status = (None, None)
+        self._last_status_emit = 0.0
+        self._last_info = None
+        self._last_info_emit = 0.0
+
+        # Scratch buffers reused every frame (allocated on the first frame)
+        self._buf_shape = None
+        self._mesh_size = None
+        self._mesh_small = None
+        # Face crop scaled to FACE_SIZE, its grayscale version, and the
+        # CLAHE-normalised face handed to match_face
+        self._roi_bgr = np.empty((FACE_SIZE, FACE_SIZE, 3), np.uint8)
+        self._roi_gray = np.empty((FACE_SIZE, FACE_SIZE), np.uint8)
+        self._roi_buf = np.empty((FACE_SIZE, FACE_SIZE), np.uint8)
+
+        # Log rows and alert snapshots are written by background threads,
+        # so disk I/O never stalls the video loop. Only the log thread
+        # touches the access log, which stays open while running. Snapshots
+        # (full frames) get their own small queue, so a burst of them can't
+        # hold much memory or delay the log rows behind JPEG encoding.
+        self._log_q = queue.Queue(maxsize=256)
+        self._log_thread = None
+        self._snap_q = queue.Queue(maxsize=8)
+        self._snap_thread = None
+        self._log_fp = None
+        self._log_writer = None
         
         # --- State Variables ---
         self.in_countdown = False
@@ -112,12 +550,31 @@ class RecognitionThread(QThread):
         self.required_blinks = 2  # Will be set from config
         self.eye_closed_counter = 0 # Frames eye has been closed
 
+        # --- Background Prediction ---
+        self._predict_pool = None    # Single worker running model.predict
+        self._clahe = None           # Contrast normalisation for faces (see setup)
+        self._predict_future = None  # Latest submitted prediction
+        self._last_pred = None       # Last (label, distance) result, reused between predictions
+        self._frame_ctr = 0          # Frames processed, for RECOG_EVERY_N
+
     def setup(self, config, arduino_port, arduino_baud):
         """
         Initializes the thread. Called by the main window *before* start().
         """
         self.config = config
         self.required_blinks = self.config['LIVENESS_BLINKS']
+
+        # --- OpenCV Runtime ---
+        # Make sure the SIMD-optimised code paths are on (thread count is set
+        # once in main_ui). On ARM these are the NEON kernels, if the
+        # installed OpenCV build has them (see Readme).
+        cv2.setUseOptimized(True)
+        # Log what OpenCV will actually use, since both settings can be
+        # overridden by the build (e.g. a single-threaded distro package)
+        print(f"OpenCV: {cv2.getNumThreads()} threads, optimised code {'on' if cv2.useOptimized() else 'off'}.")
+        cpu_neon = getattr(cv2, 'CPU_NEON', None)
+        if cpu_neon is not None and cv2.checkHardwareSupport(cpu_neon):
+            print("OpenCV: NEON optimisations available.")
         
         # --- Initialize Arduino ---
         self.relay = ArduinoRelay(arduino_port, arduino_baud)
@@ -130,11 +587,32 @@ class RecognitionThread(QThread):
             print(f"Sent Door Ajar Timeout ({timeout_sec}s) to Arduino.")
 
         # --- Initialize Mediapipe Face Mesh ---
+        # Keep landmark refinement: it also refines the eye contours the EAR
+        # indices sit on, and the 0.2 ear_threshold was tuned against those points.
         self.face_mesh = self.mp_face_mesh.FaceMesh(max_num_faces=1, 
                                                    refine_landmarks=True, 
                                                    min_detection_confidence=0.5, 
                                                    min_tracking_confidence=0.5)
 
+        # --- Background Predict Worker ---
+        # One worker: predictions stay in order, and the numpy/OpenCV work in
+        # match_face releases the GIL, so it overlaps with the next frame.
+        self._predict_pool = ThreadPoolExecutor(max_workers=1)
+
+        # --- Face Contrast Normalisation ---
+        # CLAHE evens out lighting across the face before LBPH, making match
+        # scores less sensitive to the room's lighting. Applied identically
+        # to training faces and live face crops.
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+        # --- Compile the numba Kernels ---
+        # Compiling (or loading from numba's cache) happens on the first call;
+        # doing it here keeps that stall out of the first liveness check and
+        # the first prediction (a model cache hit never runs lbp_histogram).
+        if njit is not None:
+            eye_aspect_ratios(np.zeros((len(EYE_IDX), 2), np.float32))
+            lbp_histogram(np.zeros((FACE_SIZE, FACE_SIZE), np.uint8))
+
         # --- Train the Face Recognition Model ---
         if not self.train_model():
             # If training fails (e.g., no data), stop setup
@@ -152,114 +630,289 @@ class RecognitionThread(QThread):
             self.emit_error("Fatal: 'face_images' folder not found. Please run data collection.")
             return False
 
-        # Get all subdirectories (each is a user)
-        dirs = [d for d in os.listdir(self.data_path) if os.path.isdir(os.path.join(self.data_path,d))]
-        
-        Training_data, Labels = [], []
+        # Get all subdirectories (each is a user). scandir hands back the
+        # entry type with the listing, so no extra stat per entry.
+        with os.scandir(self.data_path) as entries:
+            dirs = [e for e in entries if e.is_dir()]
+
         self.user_map = {}
-        
+        img_paths, img_labels = [], []
+
         # Build the user map (e.g., 0: 'john_doe', 1: 'jane_doe')
-        for idx, user in enumerate(dirs):
-            user_folder = os.path.join(self.data_path, user)
-            self.user_map[idx] = user
-            
-            # Load all images for this user
-            for file in os.listdir(user_folder):
-                if file.lower().endswith('.jpg'):
-                    img_path = os.path.join(user_folder, file)
-                    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-                    if img is not None:
-                        Training_data.append(img)
-                        Labels.append(idx)
+        for idx, user_dir in enumerate(dirs):
+            self.user_map[idx] = user_dir.name
+
+            # Collect all image paths for this user
+            with os.scandir(user_dir.path) as files:
+                for f in files:
+                    if f.is_file() and f.name.lower().endswith('.jpg'):
+                        img_paths.append(f.path)
+                        img_labels.append(idx)
+
+        # --- Reuse the last training if no image has changed ---
+        fingerprint = self.training_fingerprint(img_paths, img_labels)
+        if self.load_model_cache(fingerprint):
+            print(f"Loaded trained model from cache. Known users: {self.user_map.values()}")
+            self.info_updated.emit("Training complete. System ready.")
+            return True
+
+        # All faces go into one preallocated (N, H, W) uint8 block, so nothing
+        # has to be stacked or copied again before training
+        Training_data = np.empty((len(img_paths), FACE_SIZE, FACE_SIZE), np.uint8)
+
+        def load(i):
+            img = cv2.imread(img_paths[i], cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                return False
+            if img.shape == Training_data.shape[1:]:
+                Training_data[i] = img
+            else:
+                cv2.resize(img, (FACE_SIZE, FACE_SIZE), dst=Training_data[i])
+            return True
+
+        # Decode the images in parallel (imread releases the GIL, so disk
+        # reads and JPEG decoding overlap across cores)
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as ex:
+            loaded = np.fromiter(ex.map(load, range(len(img_paths))), dtype=bool, count=len(img_paths))
+
+        Labels = np.asarray(img_labels, dtype=np.int32)
+        if not loaded.all():
+            # Drop unreadable files (only then is the block copied)
+            Training_data, Labels = Training_data[loaded], Labels[loaded]
 
         if len(Training_data) == 0:
             self.emit_error("No training data found in 'face_images'. Please add users.")
             return False
 
-        Labels = np.asarray(Labels, dtype=np.int32)
+        # Same contrast normalisation as live faces (done here rather than in
+        # the pool: a CLAHE object isn't safe to share between threads)
+        for face in Training_data:
+            face[...] = self._clahe.apply(face)
         
         # Create and train the LBPH recognizer
         self.model = cv2.face.LBPHFaceRecognizer_create()
-        self.model.train(np.asarray(Training_data), Labels)
+        self.model.train(Training_data, Labels)
+
+        # --- Histogram table for fast matching ---
+        table = np.vstack([h.ravel() for h in self.model.getHistograms()]).astype(np.float32)
+        self._H_labels = self.model.getLabels().ravel()
+        # Only trust the table if our LBP reproduces this OpenCV build's
+        # histograms; otherwise keep using the recognizer's own predict().
+        self._use_table = np.allclose(lbp_histogram(Training_data[0]), table[0], atol=1e-6)
+        if not self._use_table:
+            print("LBP histogram mismatch with OpenCV. Falling back to model.predict().")
+        self._H = self.compact_table(table)
+        self._H_sums = self._H.sum(axis=1, dtype=np.float64)
+        if self._use_table:
+            self.save_model_cache(fingerprint)
         
         print(f"Training complete. Known users: {self.user_map.values()}")
         self.info_updated.emit("Training complete. System ready.")
         return True
         
-    def calculate_ear(self, eye_landmarks, frame_w, frame_h):
+    def training_fingerprint(self, img_paths, img_labels):
+        """
+        Returns a hash of everything training depends on: each image's path,
+        user, size and modification time, plus the OpenCV version, the LBP
+        kernel and MODEL_CACHE_VERSION. Any added, removed or replaced image changes it.
+        """
+        # (The LBP kernel in use is included: the cached table was only
+        # checked against that one)
+        h = hashlib.sha1(f"{MODEL_CACHE_VERSION}|{cv2.__version__}|{FACE_SIZE}|{_lbp_codes_jit is not None}".encode())
+        for path, label in sorted(zip(img_paths, img_labels)):
+            st = os.stat(path)
+            h.update(f"{self.user_map[label]}|{os.path.basename(path)}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+        return h.hexdigest()
+
+    def load_model_cache(self, fingerprint):
         """
-        Calculates the Eye Aspect Ratio (EAR) for liveness detection.
-        EAR = (||P2-P6|| + ||P3-P5||) / (2 * ||P1-P4||)
+        Restores the histogram table, labels and user map saved by
+        save_model_cache(). Returns False (and changes nothing) if there is
+        no cache or it was made from different training images.
         """
+        if not os.path.isfile(self.model_cache):
+            return False
         try:
-            # Convert landmark coordinates to pixel space
-            coords = [(int(p.x * frame_w), int(p.y * frame_h)) for p in eye_landmarks]
-            p1, p2, p3, p4, p5, p6 = coords[0], coords[1], coords[2], coords[3], coords[4], coords[5]
-            
-            # Calculate vertical distances
-            A = np.linalg.norm(np.array(p2) - np.array(p6))
-            B = np.linalg.norm(np.array(p3) - np.array(p5))
-            
-            # Calculate horizontal distance
-            C = np.linalg.norm(np.array(p1) - np.array(p4))
+            with np.load(self.model_cache) as data:
+                if str(data['fingerprint']) != fingerprint:
+                    return False
+                table, labels, users = data['table'], data['labels'], data['users'].tolist()
+        except Exception as e:
+            print(f"Could not read model cache, retraining: {e}")
+            return False
 
-            if C == 0: return 0.3 # Avoid division by zero
-            
-            ear = (A + B) / (2.0 * C)
-            return ear
+        self._H, self._H_labels = table, labels
+        self._H_sums = table.sum(axis=1, dtype=np.float64)
+        self.user_map = dict(enumerate(users))
+        # Only tables that passed the LBP check are ever cached, so the
+        # recognizer itself (the predict() fallback) isn't needed
+        self._use_table = True
+        self.model = None
+        return True
+
+    def save_model_cache(self, fingerprint):
+        """Saves the trained histogram table for the next start (see load_model_cache)."""
+        tmp_path = self.model_cache + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, fingerprint=np.array(fingerprint), table=self._H, labels=self._H_labels,
+                         users=np.array([self.user_map[i] for i in range(len(self.user_map))]))
+            # Replace in one step, so a crash never leaves a half-written cache
+            os.replace(tmp_path, self.model_cache)
         except Exception as e:
-            print(f"Error calculating EAR: {e}")
-            return 0.3 # Default to "open"
+            print(f"Could not save model cache: {e}")
+
+    def compact_table(self, table):
+        """
+        Returns the histogram table as float16 (half the memory traffic per
+        match) if that doesn't noticeably change match scores, else float32.
+        """
+        table16 = table.astype(np.float16)
+        query = table[-1]
+        d32 = chi_square_distances(table, query)
+        d16 = chi_square_distances(table16, query)
+        score_err = np.max(np.abs(d16 - d32)) / 300
+        if score_err < FLOAT16_SCORE_TOL:
+            return table16
+        print(f"float16 histogram table too lossy (score error {score_err:.2g}). Keeping float32.")
+        return table
+
+    def reset_prediction(self):
+        """Forgets the cached and in-flight predictions (e.g. the face changed)."""
+        self._predict_future = None # An in-flight result is simply ignored
+        self._last_pred = None
+
+    def match_face(self, face_roi):
+        """
+        Finds the closest training face to 'face_roi'.
+        Returns (label, distance), like LBPHFaceRecognizer.predict().
+        """
+        if not self._use_table:
+            return self.model.predict(face_roi)
+        dists = chi_square_distances(self._H, lbp_histogram(face_roi), self._H_sums)
+        best = int(np.argmin(dists))
+        return int(self._H_labels[best]), float(dists[best])
 
     def log_event(self, event_type, username, image=None):
         """
         Logs an event to the access_log.csv file.
         If the event is an alert, it also saves a snapshot.
+        Only queues the work; the log and snapshot threads do the writing.
         """
         timestamp = datetime.now()
-        
-        # --- Log to CSV ---
+        row = [timestamp.strftime("%Y-%m-%d %H:%M:%S"), event_type, username]
+
         try:
-            file_exists = os.path.isfile(self.log_file)
-            with open(self.log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    # Write header if file is new
-                    writer.writerow(["Timestamp", "Event_Type", "User"]) 
-                writer.writerow([timestamp.strftime("%Y-%m-%d %H:%M:%S"), event_type, username])
-        except Exception as e:
-            print(f"!!! Log file error: {e}")
+            self._log_q.put_nowait(row)
+        except queue.Full:
+            print(f"!!! Log queue full, dropped event: {row}")
 
-        # --- Save Intruder Snapshot ---
+        # --- Intruder Snapshot ---
         if image is not None and event_type == "ALERT_UNKNOWN":
             filename = f"ALERT_{username}_{timestamp.strftime('%Y%m%d_%H%M%S')}.jpg"
             filepath = os.path.join(self.intruder_folder, filename)
             try:
-                cv2.imwrite(filepath, image)
+                # Copy: overlays get drawn onto the frame after this call
+                self._snap_q.put_nowait((filepath, image.copy()))
+            except queue.Full:
+                print(f"!!! Snapshot queue full, dropped: {filepath}")
+
+    def _log_writer_loop(self):
+        """
+        Log thread: writes queued rows until a None sentinel arrives. The
+        file is flushed whenever the queue runs empty, so a burst of events
+        costs one flush.
+        """
+        while True:
+            row = self._log_q.get()
+            if row is None:
+                break
+
+            # --- Log to CSV ---
+            try:
+                if self._log_fp is None:
+                    self.open_log()
+                self._log_writer.writerow(row)
+                if self._log_q.empty():
+                    self._log_fp.flush()
+            except Exception as e:
+                print(f"!!! Log file error: {e}")
+        self.close_log()
+
+    def _snapshot_writer_loop(self):
+        """
+        Snapshot thread: JPEG-encodes and saves queued intruder snapshots
+        until a None sentinel arrives.
+        """
+        while True:
+            item = self._snap_q.get()
+            if item is None:
+                break
+            filepath, image = item
+            try:
+                cv2.imwrite(filepath, image, SNAPSHOT_JPEG_PARAMS)
                 print(f"Saved alert snapshot: {filepath}")
             except Exception as e:
                 print(f"!!! FAILED to save snapshot to {filepath}: {e}")
 
+    def start_log_thread(self):
+        """Starts the log and snapshot threads (once per run)."""
+        self._log_thread = threading.Thread(target=self._log_writer_loop, daemon=True)
+        self._log_thread.start()
+        self._snap_thread = threading.Thread(target=self._snapshot_writer_loop, daemon=True)
+        self._snap_thread.start()
+
+    def stop_log_thread(self):
+        """Lets the log and snapshot threads finish everything queued, then stops them."""
+        if self._log_thread:
+            self._log_q.put(None)
+            self._log_thread.join(timeout=5.0)
+            self._log_thread = None
+        if self._snap_thread:
+            self._snap_q.put(None)
+            self._snap_thread.join(timeout=5.0)
+            self._snap_thread = None
+
+    def open_log(self):
+        """Opens the access log for appending, writing the header if it is empty."""
+        self._log_fp = open(self.log_file, 'a', newline='')
+        self._log_writer = csv.writer(self._log_fp)
+        # Append mode starts at the end, so the position is the file size:
+        # 0 for a new file, but also for one that exists and is empty
+        if self._log_fp.tell() == 0:
+            self._log_writer.writerow(["Timestamp", "Event_Type", "User"])
+
+    def close_log(self):
+        """Flushes and closes the access log."""
+        if self._log_fp is not None:
+            try:
+                self._log_fp.close()
+            except Exception as e:
+                print(f"!!! Log file error: {e}")
+            self._log_fp = None
+            self._log_writer = None
+
     def run(self):
         """The main loop for the recognition thread."""
         
-        self.cap = cv2.VideoCapture(0)
+        self.cap = self.open_camera(0)
         if not self.cap.isOpened():
             self.emit_error("Camera not detected.")
             self.running = False
             return
+        self.configure_camera()
 
+        # Camera reads happen on their own thread from here on
+        self.capture = CaptureThread(self.cap)
+        self.capture.start()
+
+        self.start_log_thread()
         print("Recognition thread started.")
         audio_manager.speak("System activated.") # Startup sound
         
-        # --- Liveness Constants ---
-        # Landmark indices for EAR calculation
-        LEFT_EYE_EAR_INDICES = [362, 385, 387, 263, 373, 380]
-        RIGHT_EYE_EAR_INDICES = [33, 158, 160, 133, 144, 153]
-        ALL_EYE_LANDMARKS = list(set(LEFT_EYE_EAR_INDICES + RIGHT_EYE_EAR_INDICES))
-        
         # Reset state variables
         self.liveness_confirmed = False
+        self.reset_prediction() # Drop any result for the previous face
         self.blink_counter = 0
         self.eye_closed_counter = 0
         ear_threshold = 0.2       # EAR value below which an eye is "closed"
@@ -269,14 +922,25 @@ class RecognitionThread(QThread):
         self.alert_start_time = None 
         self.alert_triggered = False 
 
+        # The loop is paced by the camera: each pass waits for the capture
+        # thread's next frame. A camera that ignores TARGET_FPS and runs
+        # faster is held to it by a deadline instead of a fixed sleep: only
+        # the time left until the next frame is due gets slept, and nothing
+        # when a frame took longer. (The interval is slightly short, so a
+        # camera running at TARGET_FPS is never delayed by it.)
+        frame_interval = 0.9 / max(1, self.config['TARGET_FPS'])
+        next_frame_due = 0.0
+        # Only every Nth frame is handed to the UI; skipped frames are never
+        # resized or wrapped for Qt
+        publish_every_n = frame_publish_every_n(self.config)
+        recog_every_n = max(1, int(self.config['RECOG_EVERY_N']))
+        debug_overlay = bool(self.config.get('DEBUG_OVERLAY', False))
+
         while self.running:
             # --- Check for Arduino Messages (Door Ajar, etc.) ---
-            if self.relay and self.relay.ser and self.relay.ser.in_waiting > 0:
+            if self.relay and self.relay.ser:
                 try:
-                    while self.relay.ser.in_waiting > 0:
-                        msg = self.relay.ser.readline().decode('utf-8', errors='ignore').strip()
-                        if not msg: continue
-                        
+                    for msg in self.relay.read_messages():
                         print(f"Arduino msg: {msg}")
                         if "ALERT:DOOR_AJAR" in msg:
                             print("Received door ajar alert from Arduino.")
@@ -289,24 +953,35 @@ class RecognitionThread(QThread):
                     print(f"Error reading from serial: {e}")
             
             # --- Grab Frame ---
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Camera feed lost.")
-                time.sleep(1.0)
+            wait = next_frame_due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            # Wait briefly for the capture thread; on timeout, loop around so
+            # serial messages are still handled while the camera is stalled.
+            frame = self.capture.get_frame(timeout=0.1)
+            if frame is None:
                 continue
+            # One clock read per pass: every timer below compares against
+            # this, so they all agree on when this frame happened
+            now = time.monotonic()
+            next_frame_due = now + frame_interval
+            self._frame_ctr += 1
             
-            frame = cv2.flip(frame, 1) # Flip horizontally
+            if frame.shape != self._buf_shape:
+                self.allocate_buffers(frame)
+            # (Already mirrored by the capture thread.) Each frame is a fresh
+            # array owned by this loop, so overlays are drawn on it directly,
+            # but only after the face crop and any snapshot are taken.
             frame_h, frame_w, _ = frame.shape
-            frame_display = frame.copy() # We draw on this copy
             
             # --- State 1: UNLOCKED (in countdown) ---
             if self.in_countdown:
-                elapsed = time.time() - self.unlock_time
+                elapsed = now - self.unlock_time
                 remaining = max(0, self.config['COUNTDOWN_SECONDS'] - int(elapsed))
                 
                 # Update UI
-                self.status_updated.emit("UNLOCKED", "#00FF00")
-                self.info_updated.emit(f"Welcome {self.recognized_user}\n\nLocking in {remaining}s")
+                self.update_status("UNLOCKED", "#00FF00")
+                self.update_info(f"Welcome {self.recognized_user}\n\nLocking in {remaining}s")
                 
                 # --- Relock Condition ---
                 if remaining == 0:
@@ -316,11 +991,20 @@ class RecognitionThread(QThread):
                     # Reset all state variables
                     self.in_countdown = False; self.unlock_time = None; self.recognized_user = None
                     self.intent_start_time = None; self.alert_start_time = None; self.alert_triggered = False
+                    self.reset_prediction()
                     self.liveness_confirmed = False; self.blink_counter = 0
             
             # --- State 2: LOCKED (Normal operation) ---
             else:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Mesh runs on a shrunken copy (inference cost scales with
+                # pixels). Landmarks are normalised to [0, 1], so all the maths
+                # below still scales them by the full frame size.
+                # The BGR->RGB swap is done in place on the small image, so it
+                # only touches a quarter of the pixels and no second buffer.
+                # (Mediapipe copies its input, so the buffer is reused.)
+                small = cv2.resize(frame, self._mesh_size, dst=self._mesh_small,
+                                   interpolation=cv2.INTER_AREA)
+                frame_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=small)
                 frame_rgb.flags.writeable = False # Read-only for Mediapipe
                 results = self.face_mesh.process(frame_rgb)
                 frame_rgb.flags.writeable = True
@@ -331,23 +1015,16 @@ class RecognitionThread(QThread):
                     
                     # --- Step A: Liveness Check ---
                     if not self.liveness_confirmed:
-                        self.status_updated.emit("LOCKED", "#FF3333")
-                        self.info_updated.emit(f"LIVENESS CHECK\nBlinks: {self.blink_counter} / {self.required_blinks}")
+                        self.update_status("LOCKED", "#FF3333")
+                        self.update_info(f"LIVENESS CHECK\nBlinks: {self.blink_counter} / {self.required_blinks}")
 
-                        # Get eye landmark points
-                        left_eye_pts = [face_landmarks.landmark[i] for i in LEFT_EYE_EAR_INDICES]
-                        right_eye_pts = [face_landmarks.landmark[i] for i in RIGHT_EYE_EAR_INDICES]
-                        
-                        left_ear = self.calculate_ear(left_eye_pts, frame_w, frame_h)
-                        right_ear = self.calculate_ear(right_eye_pts, frame_w, frame_h)
+                        eye_pts = eye_points(face_landmarks.landmark, frame_w, frame_h)
+                        left_ear, right_ear = eye_aspect_ratios(eye_pts)
                         ear = (left_ear + right_ear) / 2.0
 
-                        # Draw eye landmarks for feedback
-                        for i in ALL_EYE_LANDMARKS:
-                            pt = face_landmarks.landmark[i]
-                            x = int(pt.x * frame_w)
-                            y = int(pt.y * frame_h)
-                            cv2.circle(frame_display, (x, y), 1, (0, 255, 0), -1)
+                        # Draw eye landmarks (debug aid only)
+                        if debug_overlay:
+                            draw_eye_points(frame, eye_pts)
 
                         # Check for blink
                         if ear < ear_threshold:
@@ -368,82 +1045,107 @@ class RecognitionThread(QThread):
                     else:
                         # Get bounding box from face mesh (more stable than Haar)
                         h, w, c = frame.shape
-                        cx_min, cy_min = w, h
-                        cx_max, cy_max = 0, 0
-                        for lm in face_landmarks.landmark:
-                            cx, cy = int(lm.x * w), int(lm.y * h)
-                            if cx < cx_min: cx_min = cx
-                            if cy < cy_min: cy_min = cy
-                            if cx > cx_max: cx_max = cx
-                            if cy > cy_max: cy_max = cy
-                        
+                        # The face outline bounds the whole mesh, so its ~36 points
+                        # give the same box as all 468 landmarks
+                        lms = face_landmarks.landmark
+                        lm_xy = np.fromiter((c for i in SILHOUETTE for c in (lms[i].x, lms[i].y)),
+                                            dtype=np.float32, count=2 * len(SILHOUETTE)).reshape(-1, 2)
+                        # Reduce first, then scale just the two corners to
+                        # pixels, pad, and clamp them to the frame
+                        scale = np.array([w, h], dtype=np.float32)
                         padding = 20
-                        x = max(0, cx_min - padding)
-                        y = max(0, cy_min - padding)
-                        box_w = min(w - 1, cx_max + padding) - x
-                        box_h = min(h - 1, cy_max + padding) - y
+                        lo = np.clip((lm_xy.min(axis=0) * scale).astype(np.int32) - padding, 0, None)
+                        hi = np.clip((lm_xy.max(axis=0) * scale).astype(np.int32) + padding, None, (w - 1, h - 1))
+                        x, y = lo.tolist()
+                        box_w, box_h = (hi - lo).tolist()
 
                         if box_w > 0 and box_h > 0:
-                            # Draw bounding box
-                            cv2.rectangle(frame_display, (x, y), (x + box_w, y + box_h), (0, 200, 255), 2)
-                            
                             # --- Predict ---
-                            frame_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                            # Crop, resize, and send to recognizer
-                            face_roi = cv2.resize(frame_gray[y:y+box_h, x:x+box_w], (200, 200))
-                            
-                            try:
-                                result = self.model.predict(face_roi)
-                                # Lower distance = better match. Convert to %
-                                confidence = int((1 - result[1] / 300) * 100) 
-                                user_name = self.user_map.get(result[0], "Unknown")
-
-                                # --- Case 1: Known User ---
-                                if confidence >= self.config['CONFIDENCE_THRESH']:
-                                    self.alert_start_time = None # Reset alert
-                                    self.alert_triggered = False 
+                            # LBPH runs on the predict pool, and only every
+                            # RECOG_EVERY_N frames: FaceMesh keeps tracking the same
+                            # face in between, so the frames in between reuse the
+                            # last result.
+                            pending = self._predict_future
+                            if pending is not None and pending.done():
+                                self._predict_future = None
+                                try:
+                                    self._last_pred = pending.result()
+                                except Exception as e:
+                                    self._last_pred = None
+                                    print(f"Recognition error: {e}")
+                                    self.update_status("ERROR", "#FF3333")
+                                    self.update_info("Liveness OK. Recognition error.")
+
+                            if self._predict_future is None and (self._last_pred is None or self._frame_ctr % recog_every_n == 0):
+                                # Crop, resize, then convert to gray (the same order
+                                # as collect_facial_data uses for the training
+                                # samples), both into reused buffers, and send to
+                                # the recognizer
+                                cv2.resize(frame[y:y+box_h, x:x+box_w], (FACE_SIZE, FACE_SIZE), dst=self._roi_bgr)
+                                cv2.cvtColor(self._roi_bgr, cv2.COLOR_BGR2GRAY, dst=self._roi_gray)
+                                # _roi_buf is only rewritten when no prediction is
+                                # pending; a job still reading it then is one that
+                                # reset_prediction() already discarded.
+                                self._clahe.apply(self._roi_gray, dst=self._roi_buf)
+                                self._predict_future = self._predict_pool.submit(self.match_face, self._roi_buf)
+
+                            if self._last_pred is not None:
+                                try:
+                                    result = self._last_pred
+                                    # Lower distance = better match. Convert to %
+                                    confidence = int((1 - result[1] / 300) * 100) 
+                                    user_name = self.user_map.get(result[0], "Unknown")
+
+                                    # --- Case 1: Known User ---
+                                    if confidence >= self.config['CONFIDENCE_THRESH']:
+                                        self.alert_start_time = None # Reset alert
+                                        self.alert_triggered = False 
                                     
-                                    if self.intent_start_time is None:
-                                        self.intent_start_time = time.time()
+                                        if self.intent_start_time is None:
+                                            self.intent_start_time = now
                                     
-                                    intent_elapsed = time.time() - self.intent_start_time
+                                        intent_elapsed = now - self.intent_start_time
                                     
-                                    # --- UNLOCK CONDITION ---
-                                    if intent_elapsed >= self.config['INTENT_TIME_SEC']:
-                                        audio_manager.speak(f"Welcome {user_name}. Door unlocked.")
-                                        self.relay.send("U")
-                                        self.log_event("UNLOCK_FACE", user_name)
-                                        self.in_countdown = True
-                                        self.unlock_time = time.time()
-                                        self.recognized_user = user_name
+                                        # --- UNLOCK CONDITION ---
+                                        if intent_elapsed >= self.config['INTENT_TIME_SEC']:
+                                            audio_manager.speak(f"Welcome {user_name}. Door unlocked.")
+                                            self.relay.send("U")
+                                            self.log_event("UNLOCK_FACE", user_name)
+                                            self.in_countdown = True
+                                            self.unlock_time = now
+                                            self.recognized_user = user_name
+                                        else:
+                                            # Show "verifying intent"
+                                            self.update_status(f"Welcome {user_name}", "#00FF00")
+                                            self.update_info(f"Liveness OK. Verifying intent...\n\nConfidence: {confidence}%")
+
+                                    # --- Case 2: Unknown User ---
                                     else:
-                                        # Show "verifying intent"
-                                        self.status_updated.emit(f"Welcome {user_name}", "#00FF00")
-                                        self.info_updated.emit(f"Liveness OK. Verifying intent...\n\nConfidence: {confidence}%")
-
-                                # --- Case 2: Unknown User ---
-                                else:
-                                    self.intent_start_time = None # Reset intent
-                                    if self.alert_start_time is None:
-                                        self.alert_start_time = time.time()
+                                        self.intent_start_time = None # Reset intent
+                                        if self.alert_start_time is None:
+                                            self.alert_start_time = now
                                     
-                                    # --- ALERT CONDITION ---
-                                    if (time.time() - self.alert_start_time > self.config['LOITER_TIME_SEC']) and not self.alert_triggered:
-                                        audio_manager.speak("Alert. Unknown person detected.")
-                                        self.log_event("ALERT_UNKNOWN", "Unknown", image=frame)
-                                        self.alert_triggered = True
+                                        # --- ALERT CONDITION ---
+                                        if (now - self.alert_start_time > self.config['LOITER_TIME_SEC']) and not self.alert_triggered:
+                                            audio_manager.speak("Alert. Unknown person detected.")
+                                            self.log_event("ALERT_UNKNOWN", "Unknown", image=frame)
+                                            self.alert_triggered = True
                                     
-                                    self.status_updated.emit("ALERT: UNKNOWN", "#FF3333")
-                                    self.info_updated.emit(f"Liveness OK. Confidence: {confidence}%")
+                                        self.update_status("ALERT: UNKNOWN", "#FF3333")
+                                        self.update_info(f"Liveness OK. Confidence: {confidence}%")
+
+                                except Exception as e:
+                                    print(f"Recognition error: {e}")
+                                    self.update_status("ERROR", "#FF3333")
+                                    self.update_info("Liveness OK. Recognition error.")
 
-                            except Exception as e:
-                                print(f"Recognition error: {e}")
-                                self.status_updated.emit("ERROR", "#FF3333")
-                                self.info_updated.emit("Liveness OK. Recognition error.")
+                            # Draw bounding box (last, so the crop and the
+                            # intruder snapshot above stay clean)
+                            cv2.rectangle(frame, (x, y), (x + box_w, y + box_h), (0, 200, 255), 2)
                         
                         else: # Bounding box was invalid
-                            self.status_updated.emit("LOCKED", "#FF3333")
-                            self.info_updated.emit("Liveness OK. Please center your face.")
+                            self.update_status("LOCKED", "#FF3333")
+                            self.update_info("Liveness OK. Please center your face.")
                 
                 # --- No Face Found ---
                 else:
@@ -452,31 +1154,192 @@ class RecognitionThread(QThread):
                     self.alert_start_time = None
                     self.alert_triggered = False 
                     self.liveness_confirmed = False
+                    self.reset_prediction() # Drop any result for the previous face
                     self.blink_counter = 0
                     self.eye_closed_counter = 0
-                    self.status_updated.emit("LOCKED", "#FF3333")
-                    self.info_updated.emit("Please look at the camera.")
+                    self.update_status("LOCKED", "#FF3333")
+                    self.update_info("Please look at the camera.")
 
-            # --- Emit the final frame to the UI ---
-            self.frame_ready.emit(frame_display)
-            # Small delay to keep thread from hogging CPU
-            time.sleep(0.03) 
+            # --- Hand the final frame to the UI ---
+            # (skipped while the UI isn't painting, e.g. a dialog is open,
+            # and only every publish_every_n frames)
+            if not self.display_paused and self._frame_ctr % publish_every_n == 0:
+                self.publish_frame(self.to_qimage(self.fit_to_display(frame)))
         
         # --- Cleanup (Loop has exited) ---
         print("Shutting down recognition thread...")
+        if self.capture:
+            self.capture.stop()
+            self.capture.wait() # Let any in-progress read finish first
         if self.cap:
             self.cap.release()
         if self.relay:
             self.relay.close()
+        self.stop_log_thread()
+        if self._predict_pool:
+            self._predict_pool.shutdown(wait=True)
         if self.face_mesh:
             self.face_mesh.close()
 
+    def allocate_buffers(self, frame):
+        """(Re)allocates the per-frame scratch buffers for this frame size."""
+        frame_h, frame_w = frame.shape[:2]
+        self._buf_shape = frame.shape
+        # FaceMesh input: the frame shrunk to MESH_WIDTH, same aspect ratio
+        # (converted to RGB in place). Never enlarged.
+        mesh_w = min(frame_w, MESH_WIDTH)
+        self._mesh_size = (mesh_w, max(1, round(frame_h * mesh_w / frame_w)))
+        self._mesh_small = np.empty((self._mesh_size[1], self._mesh_size[0], 3), np.uint8)
+
+    def open_camera(self, index):
+        """
+        Opens the camera with the platform's native backend (V4L2 on Linux,
+        DirectShow on Windows), so buffer size and FOURCC requests go straight
+        to the driver. Falls back to OpenCV's automatic choice if that fails.
+        """
+        if sys.platform.startswith('linux'):
+            backend = cv2.CAP_V4L2
+        elif sys.platform == 'win32':
+            backend = cv2.CAP_DSHOW
+        else:
+            backend = cv2.CAP_ANY
+        cap = cv2.VideoCapture(index, backend)
+        if backend != cv2.CAP_ANY and not cap.isOpened():
+            print("Camera: native backend failed, trying the default one.")
+            cap.release()
+            cap = cv2.VideoCapture(index)
+        return cap
+
+    def configure_camera(self):
+        """
+        Asks the camera for MJPG at the configured resolution and frame rate.
+        Drivers may silently pick something else, so mismatches are logged.
+        """
+        # MJPG keeps USB traffic low and avoids a raw YUYV->BGR conversion
+        # on the CPU; set it before the size, as some drivers reset on FOURCC.
+        requested = [
+            (cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'), "FOURCC"),
+            (cv2.CAP_PROP_FRAME_WIDTH, self.config['CAMERA_WIDTH'], "width"),
+            (cv2.CAP_PROP_FRAME_HEIGHT, self.config['CAMERA_HEIGHT'], "height"),
+            (cv2.CAP_PROP_FPS, self.config['TARGET_FPS'], "FPS"),
+            # Keep only the newest frame in the driver queue
+            (cv2.CAP_PROP_BUFFERSIZE, 1, "buffer size"),
+        ]
+        for prop, value, name in requested:
+            self.cap.set(prop, value)
+        # Read back what the driver actually applied (backends that don't
+        # support a property report 0 or leave their own value)
+        for prop, value, name in requested:
+            actual = self.cap.get(prop)
+            if int(actual) != int(value):
+                print(f"Camera {name}: requested {value}, got {actual:g}")
+
+    def fit_to_display(self, frame):
+        """
+        Scales a frame to fit the UI video area, keeping its aspect ratio.
+        Returns the frame unchanged if the display size isn't known yet.
+        """
+        if not self.display_size:
+            return frame
+
+        # The output size only depends on the frame and display sizes, so it
+        # is worked out once per resize rather than on every frame.
+        key = (frame.shape[:2], self.display_size)
+        if key != self._fit_key:
+            self._fit_key = key
+            self._fit_params = self.compute_fit(frame.shape[:2], self.display_size)
+
+        if self._fit_params is None:
+            return frame
+        new_size, interpolation = self._fit_params
+        return cv2.resize(frame, new_size, interpolation=interpolation)
+
+    def compute_fit(self, frame_shape, display_size):
+        """
+        Returns ((new_w, new_h), interpolation) for fitting a frame of
+        'frame_shape' into 'display_size', or None if no resize is needed.
+        """
+        target_w, target_h = display_size
+        frame_h, frame_w = frame_shape
+        scale = min(target_w / frame_w, target_h / frame_h)
+        # Round the width down to a multiple of 4 so each BGR row (w * 3 bytes)
+        # is 32-bit aligned; Qt would otherwise repack every row on display.
+        new_w = max(4, int(frame_w * scale) & ~3)
+        new_h = max(1, int(frame_h * scale))
+        if (new_w, new_h) == (frame_w, frame_h):
+            return None
+        # INTER_AREA gives clean downscales without aliasing; it is only
+        # worth its cost when shrinking, so enlargements stay on INTER_LINEAR.
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        return (new_w, new_h), interpolation
+
+    def to_qimage(self, frame):
+        """
+        Wraps a BGR frame in a QImage for the UI, so the GUI thread only has
+        to paint it. Returns (qimage, pixels). The QImage shares the memory
+        of 'pixels' (no copy), so 'pixels' must be kept alive with it.
+        """
+        # (w, h, bytes_per_line, format) only change when the frame size does,
+        # so they're worked out once per size rather than on every frame.
+        if frame.shape != self._qimg_shape:
+            h, w, _ = frame.shape
+            # Use the real row stride; fit_to_display keeps it 4-byte aligned
+            fmt = _BGR_FORMAT if _BGR_FORMAT is not None else QImage.Format_RGB888
+            self._qimg_params = (w, h, frame.strides[0], fmt)
+            self._qimg_shape = frame.shape
+
+        # Qt >= 5.14 can read BGR directly, so no colour conversion is needed
+        if _BGR_FORMAT is None:
+            # Older Qt: convert into a new array. A reused buffer could be
+            # overwritten here while the UI is still painting it.
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return QImage(frame.data, *self._qimg_params), frame
+
+    def publish_frame(self, frame):
+        """
+        Stores a (qimage, pixels) pair for the UI, replacing any frame it
+        hasn't taken yet.
+        """
+        self._frame_lock.lock()
+        self._latest_frame = frame
+        self._frame_lock.unlock()
+
+    def take_frame(self):
+        """
+        Called from the UI thread. Returns the newest (qimage, pixels) pair and
+        clears the slot, or returns None if no new frame has arrived since the
+        last call.
+        """
+        self._frame_lock.lock()
+        frame, self._latest_frame = self._latest_frame, None
+        self._frame_lock.unlock()
+        return frame
+
     def speak(self, text):
         """
         Wrapper function to call the global audio manager.
         """
         audio_manager.speak(text) 
 
+    def update_status(self, text, color):
+        """
+        Sends the main status to the UI if it changed, or as a periodic
+        refresh. The loop calls this every frame, mostly with the same text.
+        """
+        now = time.monotonic()
+        if (text, color) != self._last_status or now - self._last_status_emit > STATUS_REFRESH_INTERVAL:
+            self._last_status = (text, color)
+            self._last_status_emit = now
+            self.status_updated.emit(text, color)
+
+    def update_info(self, text):
+        """Same as update_status, for the secondary info text."""
+        now = time.monotonic()
+        if text != self._last_info or now - self._last_info_emit > STATUS_REFRESH_INTERVAL:
+            self._last_info = text
+            self._last_info_emit = now
+            self.info_updated.emit(text)
+
     def emit_error(self, message):
         """Helper function to log and emit a fatal error."""
         print(f"ERROR: {message}")
@@ -485,6 +1348,11 @@ class RecognitionThread(QThread):
 
     # --- UI Signal Slots ---
 
+    @pyqtSlot(int, int)
+    def on_display_resized(self, width, height):
+        """Slot to handle the 'display_size_signal' from the UI."""
+        self.display_size = (width, height) if width > 0 and height > 0 else None
+
     @pyqtSlot()
     def on_manual_unlock(self):
         """Slot to handle the 'manual_unlock_signal' from the UI."""
@@ -497,11 +1365,13 @@ class RecognitionThread(QThread):
         self.relay.send("U")
         self.log_event("UNLOCK_MANUAL", "Admin")
         
-        # Start a countdown just like a normal unlock
+        # Start a countdown just like a normal unlock (the time is set
+        # first, since the loop reads it as soon as in_countdown is True)
+        self.unlock_time = time.monotonic()
         self.in_countdown = True
-        self.unlock_time = time.time()
         self.recognized_user = "Admin Override"
         self.liveness_confirmed = False
+        self.reset_prediction() # Drop any result for the previous face
         self.blink_counter = 0
         
     @pyqtSlot()
@@ -524,6 +1394,7 @@ class RecognitionThread(QThread):
         self.alert_start_time = None
         self.alert_triggered = False
         self.liveness_confirmed = False
+        self.reset_prediction() # Drop any result for the previous face
         self.blink_counter = 0
 
     def stop(self):